@@ -1,6 +1,8 @@
+import hashlib
 from datetime import datetime, timedelta
 from typing import Optional
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -38,6 +40,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
+# Verified-token cache: a hit replaces signature verification + JSON decode
+# with a dict lookup. The short TTL keeps expiry honored within a minute, and
+# keying by digest bounds memory regardless of token size.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     settings = get_settings()
     credentials_exception = HTTPException(
@@ -45,15 +53,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cache_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
+        _token_cache[cache_key] = token_data
     except JWTError:
         raise credentials_exception
-    
+
     # In a real app, you would fetch the user from DB here to ensure they still exist/are active.
     # user = get_user(fake_users_db, username=token_data.username)
     # if user is None: raise credentials_exception
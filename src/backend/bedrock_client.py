@@ -1,41 +1,119 @@
+import asyncio
 import base64
 import json
 import logging
 import io
-from typing import Any, Dict, Optional
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional, Union
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from PIL import Image
 
+from .config import get_settings
+
+try:
+    # orjson is a C-extension JSON codec; noticeably faster than stdlib json
+    # on the multi-KB Bedrock responses we parse per request.
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # pragma: no cover - orjson is in requirements, but stay importable without it
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+try:
+    # msgspec decodes straight into a typed struct (one allocation, C parser)
+    # instead of a dict followed by manual str()/float() coercion.
+    import msgspec
+
+    class _ModelOut(msgspec.Struct):
+        explanation: str = ""
+        confidence: float = 0.5
+
+    _model_out_decoder = msgspec.json.Decoder(_ModelOut)
+except ImportError:  # pragma: no cover - msgspec is in requirements, but stay importable without it
+    _model_out_decoder = None
+
 logger = logging.getLogger(__name__)
 
-def _resize_image_if_needed(image_bytes: bytes, max_dim: int = 1120) -> bytes:
+_RESIZE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+# Resolved once at import; tunable via IMAGE_RESIZE_FILTER without code change.
+_RESIZE_FILTER = _RESIZE_FILTERS.get(get_settings().image_resize_filter, Image.Resampling.BILINEAR)
+
+
+def _resize_image_if_needed(image_bytes: Union[bytes, bytearray], max_dim: int = 1120) -> Union[bytes, bytearray]:
     """Resize image if getting close to Llama Vision limits (approx 1120x1120)."""
     try:
         with Image.open(io.BytesIO(image_bytes)) as img:
             w, h = img.size
             if w <= max_dim and h <= max_dim:
                 return image_bytes
-            
-            # Maintain aspect ratio
-            ratio = min(max_dim / w, max_dim / h)
-            new_w = int(w * ratio)
-            new_h = int(h * ratio)
-            
-            img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            
-            out_buffer = io.BytesIO()
-            # Convert to RGB if saving as JPEG (handle RGBA PNGs)
+
+            if img.format == "JPEG":
+                # libjpeg can decode directly at 1/2, 1/4, 1/8 scale in the
+                # DCT domain, so huge phone photos never materialize at full
+                # resolution. Ask for 2x the target so the resample below
+                # still has quality headroom.
+                img.draft("RGB", (max_dim * 2, max_dim * 2))
+
+            # Convert to RGB *before* resizing (handle RGBA PNGs) so the
+            # resample convolution runs over 3 channels instead of 4.
             if img.mode in ("RGBA", "P"):
                 img = img.convert("RGB")
-                
-            img.save(out_buffer, format="JPEG", quality=85)
+
+            # thumbnail() fuses the aspect-ratio math and resizes in place.
+            img.thumbnail((max_dim, max_dim), _RESIZE_FILTER)
+
+            out_buffer = io.BytesIO()
+            # The consumer is a model, not a human viewer: skip the optimize
+            # pass and keep default 4:2:0 subsampling for a faster encode.
+            img.save(out_buffer, format="JPEG", quality=85, optimize=False, progressive=False, subsampling=2)
             return out_buffer.getvalue()
     except Exception as e:
         logger.warning("Image resize failed, sending original: %s", e)
         return image_bytes
 
+@lru_cache(maxsize=8)
+def _get_bedrock_client(
+    region_name: str,
+    aws_access_key_id: Optional[str],
+    aws_secret_access_key: Optional[str],
+):
+    """Build (once) and reuse the Bedrock runtime client.
+
+    Client construction parses service models and opens TLS connections, so
+    creating one per request adds a multi-ms tax plus a handshake per call.
+    """
+    session_kwargs = {"region_name": region_name}
+    if aws_access_key_id and aws_secret_access_key:
+        session_kwargs["aws_access_key_id"] = aws_access_key_id
+        session_kwargs["aws_secret_access_key"] = aws_secret_access_key
+    return boto3.client(
+        service_name="bedrock-runtime",
+        config=Config(
+            max_pool_connections=64,
+            retries={"max_attempts": 2, "mode": "standard"},
+            tcp_keepalive=True,
+        ),
+        **session_kwargs,
+    )
+
+
 BASE_INSTRUCTION = (
     "You are the dog's voice. Given a single dog image, write the response "
     "as if it comes from the dog in the picture — first-person, present tense, "
@@ -44,28 +122,10 @@ BASE_INSTRUCTION = (
 )
 
 
-def build_system_instruction(tone: Optional[str]) -> str:
-    # Default Base
-    role = "You are the dog in the picture. Speak in the first-person ('I')."
-    style = "Friendly, simple, and direct."
-    content = "Describe my body language, how I feel, and what I want."
-    
-    t = (tone or "").strip().lower()
-    
-    if t == "playful":
-        style = "Super excited, high-energy, happy! Use exclamation marks! Short, punchy sentences."
-        content = "Focus on how much fun I'm having or want to have! Use words like 'Zoomies', 'Play', 'Fun'!"
-        
-    elif t == "calm":
-        style = "Soft, soothing, slow, and zen-like."
-        content = "Focus on my relaxation and peace. Use calming words."
-        
-    elif t == "trainer":
-        # Hybrid approach: Smart dog + Advice
-        role = "You are the dog, but you rely on professional dog behaviorist knowledge."
-        style = "Analytical, clear, and instructive. Use 'I' statements but explain the 'Why'."
-        content = "Analyize my specific body language signals (ears, tail, eyes, mouth). Then, conclude with a specific 'Handling Tip' for the owner on what to do next."
+_DEFAULT_ROLE = "You are the dog in the picture. Speak in the first-person ('I')."
+
 
+def _render_instruction(role: str, style: str, content: str) -> str:
     return (
         f"{role}\n"
         f"Style: {style}\n"
@@ -79,6 +139,109 @@ def build_system_instruction(tone: Optional[str]) -> str:
     )
 
 
+# Fully-rendered system instructions per tone, built once at import so the
+# hot path is a dict lookup instead of f-string assembly.
+_SYSTEM_INSTRUCTIONS = {
+    "": _render_instruction(
+        _DEFAULT_ROLE,
+        "Friendly, simple, and direct.",
+        "Describe my body language, how I feel, and what I want.",
+    ),
+    "playful": _render_instruction(
+        _DEFAULT_ROLE,
+        "Super excited, high-energy, happy! Use exclamation marks! Short, punchy sentences.",
+        "Focus on how much fun I'm having or want to have! Use words like 'Zoomies', 'Play', 'Fun'!",
+    ),
+    "calm": _render_instruction(
+        _DEFAULT_ROLE,
+        "Soft, soothing, slow, and zen-like.",
+        "Focus on my relaxation and peace. Use calming words.",
+    ),
+    # Hybrid approach: Smart dog + Advice
+    "trainer": _render_instruction(
+        "You are the dog, but you rely on professional dog behaviorist knowledge.",
+        "Analytical, clear, and instructive. Use 'I' statements but explain the 'Why'.",
+        "Analyize my specific body language signals (ears, tail, eyes, mouth). Then, conclude with a specific 'Handling Tip' for the owner on what to do next.",
+    ),
+}
+
+
+def build_system_instruction(tone: Optional[str]) -> str:
+    return _SYSTEM_INSTRUCTIONS.get((tone or "").strip().lower(), _SYSTEM_INSTRUCTIONS[""])
+
+
+# Llama 3 Vision prompt format, split around the dynamic system instruction.
+# See: https://docs.aws.amazon.com/bedrock/latest/userguide/model-parameters-meta.html
+_PROMPT_PREFIX = "<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n"
+_PROMPT_MID = "<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n<|image|>\n"
+_PROMPT_SUFFIX = "<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n"
+_USER_PROMPT = "Speak for the dog in this image. Apply the persona and style defined in the system instructions. Return ONLY JSON."
+
+
+@lru_cache(maxsize=16)
+def _json_escape(s: str) -> bytes:
+    """JSON-escape a string, without the surrounding quotes."""
+    return _json_dumps(s)[1:-1]
+
+
+# Request-body skeleton with the static prompt parts pre-escaped, so per call
+# we only escape the (cached) system instruction and splice in the base64
+# payload - no giant f-string and no escape pass over the full body.
+_BODY_PREFIX = b'{"prompt":"' + _json_escape(_PROMPT_PREFIX)
+_BODY_MID = _json_escape(_PROMPT_MID + _USER_PROMPT + _PROMPT_SUFFIX) + b'","images":["'
+_BODY_SUFFIX = b'"]}'
+
+# Base64 chunk size for body assembly: a multiple of 3, so each chunk encodes
+# without padding and the pieces concatenate into one valid base64 string.
+_B64_CHUNK_BYTES = 49152
+
+
+def _build_request_body(instruction: str, image_bytes: Union[bytes, bytearray]) -> bytearray:
+    """Assemble the invoke_model JSON body into a single growable buffer.
+
+    Base64-encoding the image in chunks straight into the bytearray avoids
+    materializing a second full-size copy of the encoded payload (which for a
+    multi-MB upload roughly halves the per-request transient memory).
+    base64 output never needs JSON escaping, so the chunks splice in raw.
+    """
+    body = bytearray(_BODY_PREFIX)
+    body += _json_escape(instruction)
+    body += _BODY_MID
+    view = memoryview(image_bytes)
+    for start in range(0, len(view), _B64_CHUNK_BYTES):
+        body += base64.b64encode(view[start:start + _B64_CHUNK_BYTES])
+    body += _BODY_SUFFIX
+    return body
+
+
+# Precompiled extraction patterns for _parse_json_fallback: fenced code
+# blocks (closing fence optional), the widest {...} span, a trailing
+# "... confidence: 0.X" / bare-float line, and a prose "explanation:" label.
+_FENCE_RE = re.compile(r"^```[^\n]*\n(.*?)(?:\n?```)?\s*$", re.S)
+_JSON_RE = re.compile(r"\{.*\}", re.S)
+_CONF_TAIL_RE = re.compile(
+    r"(?:^|\n)[ \t]*(?:[^\n]*confidence[^\n]*?[:=][ \t]*)?([01]?\.\d+|[01](?:\.0+)?)[ \t]*$", re.I
+)
+_EXPL_KEY_RE = re.compile(r"explanation[^:]*:\s*(.+)", re.I | re.S)
+
+
+def _decode_model_json(candidate: str):
+    """Decode the model's JSON object into (explanation, confidence).
+
+    Prefers the typed msgspec decoder; falls back to dict + manual coercion
+    when msgspec is unavailable or the payload needs lenient handling
+    (e.g. confidence encoded as a string). Raises on invalid JSON.
+    """
+    if _model_out_decoder is not None:
+        try:
+            out = _model_out_decoder.decode(candidate)
+            return out.explanation.strip(), float(out.confidence)
+        except Exception:
+            pass
+    obj = _json_loads(candidate)
+    return str(obj.get("explanation", "")).strip(), float(obj.get("confidence", 0.5))
+
+
 def _parse_json_fallback(text: str) -> Dict[str, Any]:
     """Parse model text as JSON; fallback to plain text.
 
@@ -89,81 +252,54 @@ def _parse_json_fallback(text: str) -> Dict[str, Any]:
     s = raw.strip()
 
     # Strip fenced code blocks if present
-    if s.startswith("```"):
-        first_newline = s.find("\n")
-        if first_newline != -1:
-            s = s[first_newline + 1 :]
-        if s.endswith("```"):
-            s = s[:-3]
-        s = s.strip()
-
-    # Try to isolate JSON substring if mixed with prose
-    if "{" in s and "}" in s:
-        start = s.find("{")
-        end = s.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            candidate = s[start : end + 1]
-            try:
-                obj = json.loads(candidate)
-                explanation = str(obj.get("explanation", "")).strip()
-                confidence = float(obj.get("confidence", 0.5))
-                if explanation:
-                    if explanation.startswith('"') and explanation.endswith('"'):
-                        explanation = explanation[1:-1].strip()
-                    return {"explanation": explanation, "confidence": confidence}
-            except Exception:
-                pass
+    fence = _FENCE_RE.match(s)
+    if fence:
+        s = fence.group(1).strip()
+
+    # Try to isolate the JSON object even if mixed with prose
+    json_match = _JSON_RE.search(s)
+    if json_match:
+        try:
+            explanation, confidence = _decode_model_json(json_match.group(0))
+            if explanation:
+                if explanation.startswith('"') and explanation.endswith('"'):
+                    explanation = explanation[1:-1].strip()
+                return {"explanation": explanation, "confidence": confidence}
+        except Exception:
+            pass
 
+    # Second chance: the whole string may itself be the JSON object. The span
+    # match above only returns for non-empty explanations, so this also covers
+    # payloads like {"confidence": 0.9} with the explanation empty or absent.
     try:
-        obj = json.loads(s)
-        explanation = str(obj.get("explanation", "")).strip()
-        confidence = float(obj.get("confidence", 0.5))
+        explanation, confidence = _decode_model_json(s)
         if explanation.startswith('"') and explanation.endswith('"'):
             explanation = explanation[1:-1].strip()
         return {"explanation": explanation, "confidence": confidence}
     except Exception:
-        cleaned = s
-        # Heuristic: if the text ends with something that looks like a float (e.g. "0.9")
-        # try to extract it as confidence.
-        lines = [line.strip() for line in cleaned.split("\n") if line.strip()]
-        if lines:
-            last_line = lines[-1]
-            try:
-                # Check if the last line is just a float or "Confidence: 0.X"
-                text_to_parse = last_line
-                if "confidence" in last_line.lower():
-                    colon = last_line.find(":")
-                    if colon != -1:
-                        text_to_parse = last_line[colon + 1 :].strip()
-                
-                val = float(text_to_parse)
-                if 0 <= val <= 1:
-                    confidence = val
-                    # Remove the last line from explanation
-                    cleaned = "\n".join(lines[:-1]).strip()
-                    return {"explanation": cleaned, "confidence": confidence}
-            except ValueError:
-                pass
-
-        if "explanation" in cleaned.lower():
-            try:
-                lower = cleaned.lower()
-                idx = lower.find("explanation")
-                colon = cleaned.find(":", idx)
-                if colon != -1:
-                    maybe = cleaned[colon + 1 :].strip()
-                    maybe = maybe.strip().strip('"').strip("'}]")
-                    if maybe:
-                        cleaned = maybe
-            except Exception:
-                pass
-        return {"explanation": cleaned, "confidence": 0.5}
+        pass
+
+    cleaned = s
+    # Heuristic: if the text ends with something that looks like a float
+    # (e.g. "0.9" or "Confidence: 0.9"), extract it as confidence.
+    conf_tail = _CONF_TAIL_RE.search(cleaned)
+    if conf_tail:
+        val = float(conf_tail.group(1))
+        if 0 <= val <= 1:
+            return {"explanation": cleaned[: conf_tail.start()].strip(), "confidence": val}
+
+    expl = _EXPL_KEY_RE.search(cleaned)
+    if expl:
+        maybe = expl.group(1).strip().strip('"').strip("'}]").strip()
+        if maybe:
+            cleaned = maybe
+    return {"explanation": cleaned, "confidence": 0.5}
 
 
 def analyze_image(
     region_name: str,
     model_id: str,
-    image_bytes: bytes,
+    image_bytes: Union[bytes, bytearray],
     mime_type: str,
     aws_access_key_id: Optional[str] = None,
     aws_secret_access_key: Optional[str] = None,
@@ -171,34 +307,19 @@ def analyze_image(
 ) -> Dict[str, Any]:
     """Call AWS Bedrock Llama 3 Vision API and return structured result."""
     
-    session_kwargs = {"region_name": region_name}
-    if aws_access_key_id and aws_secret_access_key:
-        session_kwargs["aws_access_key_id"] = aws_access_key_id
-        session_kwargs["aws_secret_access_key"] = aws_secret_access_key
-    
     try:
-        bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            **session_kwargs
-        )
+        bedrock_runtime = _get_bedrock_client(region_name, aws_access_key_id, aws_secret_access_key)
     except Exception as e:
         logger.error("Failed to create Bedrock client: %s", e)
         raise
 
     instruction = build_system_instruction(tone)
-    
-    # Llama 3 Vision prompt format
-    # See: https://docs.aws.amazon.com/bedrock/latest/userguide/model-parameters-meta.html
-    
+
     # Resize if needed to fit model limits
     image_bytes = _resize_image_if_needed(image_bytes)
 
-    user_prompt = "Speak for the dog in this image. Apply the persona and style defined in the system instructions. Return ONLY JSON."
-    
-    body = json.dumps({
-        "prompt": f"<|begin_of_text|><|start_header_id|>system<|end_header_id|>\n\n{instruction}<|eot_id|><|start_header_id|>user<|end_header_id|>\n\n<|image|>\n{user_prompt}<|eot_id|><|start_header_id|>assistant<|end_header_id|>\n\n",
-        "images": [base64.b64encode(image_bytes).decode("utf-8")],
-    })
+    # botocore accepts any bytes-like body, so the bytearray goes out as-is.
+    body = _build_request_body(instruction, image_bytes)
 
     try:
         response = bedrock_runtime.invoke_model(
@@ -208,9 +329,11 @@ def analyze_image(
             contentType="application/json",
         )
         
-        response_body = json.loads(response.get("body").read())
-        text = response_body.get("generation") or ""
-        
+        # Parse the streamed body bytes in one pass and pull out the only
+        # field we use; the rest of the response dict is dropped immediately.
+        text = _json_loads(response["body"].read()).get("generation") or ""
+
+
         if not text:
             return {"explanation": "No interpretation available.", "confidence": 0.0}
             
@@ -222,3 +345,30 @@ def analyze_image(
     except Exception as e:
         logger.error("Unexpected error during Bedrock call: %s", e)
         raise
+
+
+async def analyze_image_async(
+    region_name: str,
+    model_id: str,
+    image_bytes: Union[bytes, bytearray],
+    mime_type: str,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    tone: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run analyze_image on a worker thread so the event loop stays free.
+
+    Both the PIL resize (CPU-bound, releases the GIL in C code) and the
+    blocking boto3 invoke_model call would otherwise stall every concurrent
+    request for the duration of the Bedrock round-trip.
+    """
+    return await asyncio.to_thread(
+        analyze_image,
+        region_name=region_name,
+        model_id=model_id,
+        image_bytes=image_bytes,
+        mime_type=mime_type,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        tone=tone,
+    )
@@ -1,5 +1,6 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -11,6 +12,7 @@ class Settings:
     sqlite_path: str
     bedrock_region: str
     bedrock_model_id: str
+    image_resize_filter: str
     aws_access_key_id: str | None
     aws_secret_access_key: str | None
     jwt_secret_key: str
@@ -32,7 +34,9 @@ def _get_int(name: str, default: int) -> int:
     except Exception:
         return default
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    # Environment doesn't change at runtime, so parse it once per process.
     # Default upload limit ~6MB
     max_upload_bytes = _get_int("MAX_UPLOAD_BYTES", 6 * 1024 * 1024)
 
@@ -45,7 +49,11 @@ def get_settings() -> Settings:
     bedrock_model_id = os.getenv("BEDROCK_MODEL_ID", "meta.llama3-2-11b-instruct-v1:0")
     aws_access_key_id = os.getenv("AWS_ACCESS_KEY_ID")
     aws_secret_access_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-    
+
+    # Resampling filter for the pre-model resize. The model can't tell the
+    # difference, so default to the fast one (bilinear ~3x faster than lanczos).
+    image_resize_filter = os.getenv("IMAGE_RESIZE_FILTER", "bilinear").lower()
+
     # Auth config
     jwt_secret_key = os.getenv("JWT_SECRET_KEY", "changeme_dev_secret")
     jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
@@ -56,6 +64,7 @@ def get_settings() -> Settings:
         sqlite_path=sqlite_path,
         bedrock_region=bedrock_region,
         bedrock_model_id=bedrock_model_id,
+        image_resize_filter=image_resize_filter,
         aws_access_key_id=aws_access_key_id,
         aws_secret_access_key=aws_secret_access_key,
         jwt_secret_key=jwt_secret_key,
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
 from abc import ABC, abstractmethod
 from .models import Interpretation, Quota, VoiceSettings, User
 
@@ -22,6 +22,11 @@ class Repository(ABC):
     def save_interpretation(self, id_: str, explanation: str, confidence: float, user_id: Optional[str] = None, image_path: Optional[str] = None) -> None:
         ...
 
+    @abstractmethod
+    def save_interpretations_bulk(self, rows: Iterable[Tuple[str, Optional[str], str, float, Optional[str]]]) -> None:
+        """Insert many (id, user_id, explanation, confidence, image_path) rows in one transaction."""
+        ...
+
     @abstractmethod
     def get_interpretation(self, id_: str) -> Optional[Interpretation]:
         ...
@@ -2,7 +2,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: str
     email: str
@@ -10,7 +10,7 @@ class User:
     is_verified: bool = True
     created_at: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Interpretation:
     id: str
     explanation: str
@@ -19,13 +19,13 @@ class Interpretation:
     user_id: Optional[str] = None
     image_path: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class Quota:
     user_id: str
     period_start: str
     count: int
 
-@dataclass
+@dataclass(slots=True)
 class VoiceSettings:
     user_id: str
     voice_id: Optional[str]
@@ -0,0 +1,27 @@
+"""One-shot migration runner: ``python -m src.backend.migrate``.
+
+Run by the container entrypoint before Uvicorn forks its workers, so schema
+changes happen exactly once instead of racing across every worker's startup.
+"""
+import logging
+
+from .db.deps import get_repo
+from .storage import init_db
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    # Legacy history.db schema (no-op if already present)
+    try:
+        init_db()
+    except Exception:
+        logger.warning("Legacy storage init failed; continuing", exc_info=True)
+    repo = get_repo()
+    repo.apply_migrations()
+    logger.info("Migrations applied")
+
+
+if __name__ == "__main__":
+    main()
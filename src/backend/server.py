@@ -1,10 +1,20 @@
+import asyncio
+import atexit
+import fcntl
+import hashlib
+import html
 import logging
 import os
+import queue
+import string
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
 from typing import Any, Dict
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
+import orjson
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 from .config import get_settings
@@ -12,13 +22,24 @@ from .bedrock_client import analyze_image as analyze_with_bedrock, _parse_json_f
 from .storage import init_db  # legacy init for backward compat
 from .db.deps import get_repo
 from .db.interfaces import Repository
-import uuid
 
-# Basic logging
+# Basic logging, with record I/O moved off the request threads: handlers hang
+# off a QueueListener thread and the root logger only does a queue put, so
+# formatting/stream writes never hold up a request at high RPS.
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Dog Body Language Interpreter")
+# Bound once: settings are immutable for the process lifetime.
+_SETTINGS = get_settings()
+
+# orjson renders every dict-returning endpoint ~2-5x faster than stdlib json
+app = FastAPI(title="Dog Body Language Interpreter", default_response_class=ORJSONResponse)
 
 # Dev CORS (adjust origins for production)
 app.add_middleware(
@@ -29,17 +50,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_INDEX_PATH = "src/frontend/index.html"
+try:
+    with open(_INDEX_PATH, "rb") as _f:
+        _INDEX_ETAG = '"%s"' % hashlib.blake2b(_f.read(), digest_size=8).hexdigest()
+except OSError:  # running from a different cwd (e.g. tests)
+    _INDEX_ETAG = None
+
+
 @app.get("/")
-def index() -> FileResponse:
-    # Serve the frontend directly from the backend container.
-    return FileResponse("src/frontend/index.html")
+def index(request: Request) -> Response:
+    # Serve the frontend directly from the backend container. Repeat views
+    # from the same browser get a header-only 304 instead of the payload.
+    if _INDEX_ETAG and request.headers.get("if-none-match") == _INDEX_ETAG:
+        return Response(status_code=304, headers={"ETag": _INDEX_ETAG})
+    headers = {"Cache-Control": "public, max-age=60"}
+    if _INDEX_ETAG:
+        headers["ETag"] = _INDEX_ETAG
+    return FileResponse(_INDEX_PATH, headers=headers)
 
 # Optional: serve static assets if added later
 app.mount("/static", StaticFiles(directory="src/frontend"), name="static")
 
+_HEALTH_BODY = b'{"status":"ok"}'
+
 @app.get("/health")
-def health() -> Dict[str, Any]:
-    return {"status": "ok"}
+def health() -> Response:
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 @app.on_event("startup")
 def startup_event() -> None:
@@ -48,18 +85,25 @@ def startup_event() -> None:
         init_db()
     except Exception:
         pass
-    # Ensure DB repo exists and migrations are applied
+    # Deployments run `python -m src.backend.migrate` before Uvicorn forks,
+    # so this is a belt-and-braces pass (cheap: apply_migrations
+    # short-circuits when up to date). The advisory lock keeps multiple
+    # workers from racing the DDL and dev bootstrap.
     try:
         repo = get_repo()
-        repo.apply_migrations()
-        
-        # Test User Initialization
-        test_email = "test@example.com"
-        if not repo.get_user_by_email(test_email):
-            from .auth import get_password_hash
-            repo.create_user(test_email, get_password_hash("password123"))
-            logger.info("Test user created: %s", test_email)
-            
+        os.makedirs("data", exist_ok=True)
+        with open(os.path.join("data", ".migrate.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            repo.apply_migrations()
+
+            # Test User Initialization (dev only)
+            if os.getenv("APP_ENV", "dev") == "dev":
+                test_email = "test@example.com"
+                if not repo.get_user_by_email(test_email):
+                    from .auth import get_password_hash
+                    repo.create_user(test_email, get_password_hash("password123"))
+                    logger.info("Test user created: %s", test_email)
+
     except Exception as e:
         logger.exception("DB init/migrations failed: %s", e)
 
@@ -72,6 +116,15 @@ from pydantic import BaseModel
 
 interpreter_service = InterpretationService()
 
+@app.on_event("startup")
+async def start_batch_writer() -> None:
+    # Batches save_interpretation rows under write bursts (see service).
+    interpreter_service.start_writer(get_repo())
+
+@app.on_event("shutdown")
+async def stop_batch_writer() -> None:
+    await interpreter_service.stop_writer()
+
 # --- Auth Models ---
 class LoginRequest(BaseModel):
     email: str
@@ -98,13 +151,15 @@ async def login(req: LoginRequest, repo: Repository = Depends(get_repo)):
     """
     user = repo.get_user_by_email(req.email)
     
+    # argon2 is deliberately slow (tens of ms); run it on the threadpool so
+    # the event loop isn't stalled for every login/signup.
     if user:
         # Authenticate
-        if not verify_password(req.password, user.password_hash):
+        if not await asyncio.to_thread(verify_password, req.password, user.password_hash):
             raise HTTPException(status_code=400, detail="Incorrect password")
     else:
         # Sign Up
-        dashed = get_password_hash(req.password)
+        dashed = await asyncio.to_thread(get_password_hash, req.password)
         # Create user with verified=True by default for now
         user = repo.create_user(email=req.email, password_hash=dashed)
 
@@ -144,7 +199,7 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
          # Let's fail secure for the strict OAuth endpoint.
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     
-    if not verify_password(form_data.password, user.password_hash):
+    if not await asyncio.to_thread(verify_password, form_data.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
     access_token_expires = timedelta(minutes=60)
@@ -168,7 +223,7 @@ async def interpret_dog_body_language_v1(
     save: bool = Form(False),
     repo: Repository = Depends(get_repo),
     current_user: TokenData = Depends(get_current_user), # Require Auth for V1
-) -> JSONResponse:
+) -> ORJSONResponse:
     return await _handle_interpret(image, tone, save, repo)
 
 
@@ -180,26 +235,57 @@ async def interpret_dog_body_language(
     tone: str | None = Form(None),
     save: bool = Form(False),
     repo: Repository = Depends(get_repo),
-) -> JSONResponse:
+) -> ORJSONResponse:
     # Legacy endpoint does not require Auth
     return await _handle_interpret(image, tone, save, repo)
 
 
-async def _handle_interpret(image: UploadFile, tone: str | None, save: bool, repo: Repository) -> JSONResponse:
-    logger.info("Received upload: filename=%s content_type=%s", image.filename, image.content_type)
+_ALLOWED_MIME = frozenset({"image/jpeg", "image/png"})
+_ALLOWED_TONES = frozenset({"playful", "calm", "trainer"})
+_UPLOAD_CHUNK_BYTES = 64 * 1024
+# File signatures for the two accepted formats: content_type is
+# client-controlled, the first bytes are not.
+_MAGIC_PREFIXES = (b"\xff\xd8\xff", b"\x89PNG")
+
 
-    if image.content_type not in {"image/jpeg", "image/png"}:
+async def _read_upload_capped(image: UploadFile, cap: int) -> bytearray:
+    """Accumulate the upload in chunks, aborting as soon as it exceeds cap."""
+    buf = bytearray()
+    while chunk := await image.read(_UPLOAD_CHUNK_BYTES):
+        buf.extend(chunk)
+        if len(buf) > cap:
+            raise HTTPException(status_code=413, detail=f"Image too large. Max {cap} bytes.")
+    return buf
+
+
+async def _handle_interpret(image: UploadFile, tone: str | None, save: bool, repo: Repository) -> ORJSONResponse:
+    # Per-request detail is debug-only; the success line below already gives
+    # one INFO record per interpretation.
+    logger.debug("Received upload: filename=%s content_type=%s", image.filename, image.content_type)
+
+    if image.content_type not in _ALLOWED_MIME:
         raise HTTPException(status_code=400, detail="Unsupported file type. Please upload JPEG or PNG.")
 
-    settings = get_settings()
-    data = await image.read()
+    # Reject unknown tones here rather than paying for a Bedrock call that
+    # would just use the default persona.
+    if tone and tone.strip().lower() not in _ALLOWED_TONES:
+        raise HTTPException(status_code=400, detail=f"Unknown tone. Supported: {', '.join(sorted(_ALLOWED_TONES))}.")
 
-    if len(data) > settings.max_upload_bytes:
+    settings = _SETTINGS
+
+    # Reject from the declared size before buffering a single byte; the
+    # streaming cap below still protects against lying Content-Length.
+    if image.size is not None and image.size > settings.max_upload_bytes:
         raise HTTPException(status_code=413, detail=f"Image too large. Max {settings.max_upload_bytes} bytes.")
 
+    data = await _read_upload_capped(image, settings.max_upload_bytes)
+
+    if not data.startswith(_MAGIC_PREFIXES):
+        raise HTTPException(status_code=400, detail="File content does not match a JPEG or PNG image.")
+
     try:
         # Use Service Layer
-        result = interpreter_service.interpret(
+        result = await interpreter_service.interpret(
             image_bytes=data,
             mime_type=image.content_type,
             tone=tone,
@@ -208,13 +294,13 @@ async def _handle_interpret(image: UploadFile, tone: str | None, save: bool, rep
         )
         
         logger.info("Responding with success (source=%s): confidence=%.2f", result["source"], result["confidence"])
-        return JSONResponse(content=result, headers={"X-LLM-Source": result["source"]})
+        return ORJSONResponse(content=result, headers={"X-LLM-Source": result["source"]})
         
     except HTTPException:
         raise
     except Exception as e:
         logger.exception("Service call failed: %s", e)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=502,
             content={
                 "status": "error",
@@ -224,56 +310,75 @@ async def _handle_interpret(image: UploadFile, tone: str | None, save: bool, rep
             },
         )
 
-@app.get("/api/share/{share_id}")
-def get_shared_interpretation(share_id: str) -> JSONResponse:
-    repo = get_repo()
-    inter = repo.get_interpretation(share_id)
+# Shared interpretations are write-once/read-many, so unbounded-lifetime
+# read-through caching is safe. Misses raise (exceptions are not cached by
+# lru_cache), so a link viewed before its row lands is retried next hit.
+@lru_cache(maxsize=10_000)
+def _load_shared_interpretation(share_id: str):
+    inter = get_repo().get_interpretation(share_id)
     if not inter:
         raise HTTPException(status_code=404, detail="Not found")
-    _id = inter.id
-    explanation = inter.explanation
-    confidence = inter.confidence
-    created_at = inter.created_at
-    return JSONResponse(
+    return inter
+
+
+@app.get("/api/share/{share_id}")
+def get_shared_interpretation(share_id: str) -> ORJSONResponse:
+    inter = _load_shared_interpretation(share_id)
+    return ORJSONResponse(
         content={
-            "id": _id,
-            "explanation": explanation,
-            "confidence": confidence,
-            "created_at": created_at,
-        }
+            "id": inter.id,
+            "explanation": inter.explanation,
+            "confidence": inter.confidence,
+            "created_at": inter.created_at,
+        },
+        headers={"Cache-Control": "public, max-age=3600, immutable"},
     )
 
-@app.get("/share/{share_id}")
-def share_page(share_id: str) -> HTMLResponse:
-    repo = get_repo()
-    inter = repo.get_interpretation(share_id)
-    if not inter:
-        raise HTTPException(status_code=404, detail="Not found")
-    _id = inter.id
-    explanation = inter.explanation
-    confidence = inter.confidence
-    created_at = inter.created_at
-    pct = round(float(confidence) * 100)
-    html = f"""
+# Compiled once at import; substitution only touches the four placeholders
+# instead of re-assembling the whole document (and its static CSS) per view.
+SHARE_TEMPLATE = string.Template("""
     <!doctype html>
     <html><head><meta charset='utf-8'><title>Shared Dog Interpretation</title>
     <meta name='viewport' content='width=device-width, initial-scale=1'>
-    <style>body{{font-family: -apple-system, ui-sans-serif; margin:20px; color:#0b1220}} .card{{max-width:720px;margin:0 auto;border:1px solid #ddd;border-radius:12px;padding:16px}} .muted{{color:#555}}</style>
+    <style>body{font-family: -apple-system, ui-sans-serif; margin:20px; color:#0b1220} .card{max-width:720px;margin:0 auto;border:1px solid #ddd;border-radius:12px;padding:16px} .muted{color:#555}</style>
     </head><body>
       <div class='card'>
         <h2>Dog says:</h2>
-        <div style='white-space: pre-wrap'>{explanation}</div>
-        <div class='muted' style='margin-top:8px'>Confidence: {pct}% &middot; Created: {created_at}</div>
-        <div class='muted' style='margin-top:12px'>Share ID: {_id}</div>
+        <div style='white-space: pre-wrap'>$explanation</div>
+        <div class='muted' style='margin-top:8px'>Confidence: $pct% &middot; Created: $created_at</div>
+        <div class='muted' style='margin-top:12px'>Share ID: $id</div>
       </div>
     </body></html>
-    """
-    return HTMLResponse(content=html)
+    """)
+
+
+@lru_cache(maxsize=10_000)
+def _render_share_page(share_id: str) -> str:
+    inter = _load_shared_interpretation(share_id)
+    return SHARE_TEMPLATE.substitute(
+        # Model output goes into the DOM: escape it.
+        explanation=html.escape(inter.explanation),
+        pct=round(float(inter.confidence) * 100),
+        created_at=html.escape(str(inter.created_at)),
+        id=html.escape(inter.id),
+    )
 
-@app.get("/api/registry")
-def api_registry() -> JSONResponse:
-    """Return structured, searchable API documentation for this service."""
-    registry: Dict[str, Any] = {
+
+@app.get("/share/{share_id}")
+def share_page(share_id: str, request: Request) -> Response:
+    # Shares are immutable, so the id itself is a valid ETag: a matching
+    # If-None-Match returns 304 without touching the cache or DB at all.
+    etag = f'"{share_id}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return HTMLResponse(
+        content=_render_share_page(share_id),
+        headers={"ETag": etag, "Cache-Control": "public, max-age=3600, immutable"},
+    )
+
+# The registry is a pure constant: build and serialize it once at import so
+# the endpoint is a header-plus-bytes return with zero per-request allocation.
+_REGISTRY: Dict[str, Any] = {
         "service": {
             "name": "Dog Body Language Interpreter",
             "version": "1.1",
@@ -338,4 +443,18 @@ def api_registry() -> JSONResponse:
             },
         ],
     }
-    return JSONResponse(content=registry)
+
+_REGISTRY_BODY = orjson.dumps(_REGISTRY)
+_REGISTRY_ETAG = '"%s"' % hashlib.blake2b(_REGISTRY_BODY, digest_size=8).hexdigest()
+
+
+@app.get("/api/registry")
+def api_registry(request: Request) -> Response:
+    """Return structured, searchable API documentation for this service."""
+    if request.headers.get("if-none-match") == _REGISTRY_ETAG:
+        return Response(status_code=304, headers={"ETag": _REGISTRY_ETAG})
+    return Response(
+        content=_REGISTRY_BODY,
+        media_type="application/json",
+        headers={"ETag": _REGISTRY_ETAG, "Cache-Control": "public, max-age=86400"},
+    )
@@ -1,22 +1,74 @@
+import asyncio
 import logging
-import uuid
-from typing import Dict, Any, Optional
+import secrets
+from typing import Dict, Any, Optional, Union
 
 from fastapi import HTTPException
 
 from ..config import get_settings
-from ..bedrock_client import analyze_image as analyze_with_bedrock, _parse_json_fallback
+from ..bedrock_client import analyze_image_async, _parse_json_fallback
 from ..db.interfaces import Repository
 
 logger = logging.getLogger(__name__)
 
+# Queued by stop_writer() to shut the batch writer down. A sentinel (rather
+# than task cancellation) means FIFO ordering guarantees every row accepted
+# before shutdown is saved first - cancellation can be swallowed by
+# asyncio.wait_for and would drop the batch being collected.
+_SHUTDOWN = object()
+
 class InterpretationService:
+    # Batch writer tuning: drain up to _BATCH_MAX rows or whatever arrives
+    # within _BATCH_WAIT seconds, then commit them in one transaction.
+    _BATCH_MAX = 128
+    _BATCH_WAIT = 0.02
+
     def __init__(self):
         self.settings = get_settings()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._inflight_saves = 0
+
+    def start_writer(self, repo: Repository) -> None:
+        """Start the background batch writer. Call once from app startup."""
+        if self._writer_task is None:
+            self._queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer_loop(repo))
+
+    async def stop_writer(self) -> None:
+        """Stop the batch writer, flushing everything already accepted."""
+        if self._writer_task is not None:
+            task, self._writer_task = self._writer_task, None
+            self._queue.put_nowait(_SHUTDOWN)
+            await task
+            self._queue = None
+
+    async def _writer_loop(self, repo: Repository) -> None:
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            rows = [await queue.get()]
+            while rows[-1] is not _SHUTDOWN and len(rows) < self._BATCH_MAX:
+                try:
+                    rows.append(await asyncio.wait_for(queue.get(), timeout=self._BATCH_WAIT))
+                except asyncio.TimeoutError:
+                    break
+            if rows[-1] is _SHUTDOWN:
+                rows.pop()
+                stopping = True
+                # Late arrivals raced the sentinel; they were acknowledged
+                # too, so fold them into this final batch.
+                while not queue.empty():
+                    rows.append(queue.get_nowait())
+            if rows:
+                try:
+                    await asyncio.to_thread(repo.save_interpretations_bulk, rows)
+                except Exception as e:
+                    logger.exception("Batch save of %d interpretations failed: %s", len(rows), e)
 
-    def interpret(
+    async def interpret(
         self,
-        image_bytes: bytes,
+        image_bytes: Union[bytes, bytearray],
         mime_type: str,
         tone: Optional[str] = None,
         repo: Optional[Repository] = None,
@@ -25,18 +77,19 @@ class InterpretationService:
         """
         Orchestrates the interpretation flow:
         1. Checks AWS credentials.
-        2. Calls Bedrock for analysis.
+        2. Calls Bedrock for analysis (off the event loop).
         3. Parses/Sanitizes the result.
         4. Saves to database if requested.
         """
-        
+
         # 1. Credential Check
         if not self.settings.aws_access_key_id or not self.settings.aws_secret_access_key:
              raise HTTPException(status_code=500, detail="Server misconfiguration: AWS credentials not set.")
 
         try:
-            # 2. Call Bedrock
-            result = analyze_with_bedrock(
+            # 2. Call Bedrock (resize + invoke run on a worker thread, so the
+            # event loop keeps serving other requests during the round-trip)
+            result = await analyze_image_async(
                 region_name=self.settings.bedrock_region,
                 model_id=self.settings.bedrock_model_id,
                 image_bytes=image_bytes,
@@ -47,15 +100,22 @@ class InterpretationService:
             )
             
             # 3. Parse/Sanitize
-            explanation = str(result.get("explanation", "") or "").strip()
-            # If the model leaked JSON into the explanation string, try to extract it
-            if "{" in explanation and "}" in explanation:
-                parsed = _parse_json_fallback(explanation)
-                explanation = parsed.get("explanation", explanation)
-                if "confidence" not in result:
-                    result["confidence"] = parsed.get("confidence", 0.5)
-
-            confidence = float(result.get("confidence", 0.5))
+            explanation = result.get("explanation")
+            confidence = result.get("confidence")
+            if isinstance(explanation, str) and explanation and isinstance(confidence, (int, float)):
+                # Happy path: analyze_image already returned well-typed fields,
+                # so the embedded-JSON rescue below is pure overhead.
+                explanation = explanation.strip()
+                confidence = float(confidence)
+            else:
+                explanation = str(explanation or "").strip()
+                # If the model leaked JSON into the explanation string, try to extract it
+                if "{" in explanation and "}" in explanation:
+                    parsed = _parse_json_fallback(explanation)
+                    explanation = parsed.get("explanation", explanation)
+                    if "confidence" not in result:
+                        result["confidence"] = parsed.get("confidence", 0.5)
+                confidence = float(result.get("confidence", 0.5))
             
             response: Dict[str, Any] = {
                 "status": "ok",
@@ -66,9 +126,22 @@ class InterpretationService:
             
             # 4. Save to DB (Persistence)
             if save and repo:
-                share_id = uuid.uuid4().hex
+                # Same 128 bits of entropy as uuid4 but 22 chars instead of 32:
+                # smaller primary key/index and shorter share URLs.
+                share_id = secrets.token_urlsafe(16)
                 try:
-                    repo.save_interpretation(share_id, explanation, confidence)
+                    if self._queue is not None and self._inflight_saves > 0:
+                        # Another save is already holding the fsync: join the
+                        # writer's next batch so the cost is amortized.
+                        self._queue.put_nowait((share_id, None, explanation, confidence, None))
+                    else:
+                        # Idle path: write directly (off the event loop) so a
+                        # share link is readable the moment we return it.
+                        self._inflight_saves += 1
+                        try:
+                            await asyncio.to_thread(repo.save_interpretation, share_id, explanation, confidence)
+                        finally:
+                            self._inflight_saves -= 1
                     response["share_id"] = share_id
                 except Exception as e:
                     logger.exception("Failed to save interpretation: %s", e)
@@ -1,15 +1,40 @@
 import os
 import sqlite3
+import threading
 from typing import Optional, Tuple, Dict
 
 DB_DIR = os.path.join(os.getcwd(), "data")
 DB_PATH = os.path.join(DB_DIR, "history.db")
 
+# journal_mode=WAL persists on the database file; the rest are per-connection.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=134217728;
+"""
+
+_local = threading.local()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # One long-lived connection per (thread, path): reopening the file and
+    # re-parsing the schema on every call costs far more than the queries.
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        conn.executescript(_CONNECTION_PRAGMAS)
+        conns[db_path] = conn
+    return conn
+
 
 def init_db(path: Optional[str] = None) -> None:
     db_path = path or DB_PATH
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
+    with _connect(db_path) as conn:
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS interpretations (
@@ -24,7 +49,7 @@ def init_db(path: Optional[str] = None) -> None:
 
 def save_interpretation(id_: str, explanation: str, confidence: float, path: Optional[str] = None) -> None:
     db_path = path or DB_PATH
-    with sqlite3.connect(db_path) as conn:
+    with _connect(db_path) as conn:
         conn.execute(
             "INSERT INTO interpretations (id, explanation, confidence) VALUES (?, ?, ?)",
             (id_, explanation, float(confidence)),
@@ -33,12 +58,11 @@ def save_interpretation(id_: str, explanation: str, confidence: float, path: Opt
 
 def get_interpretation(id_: str, path: Optional[str] = None) -> Optional[Tuple[str, str, float, str]]:
     db_path = path or DB_PATH
-    with sqlite3.connect(db_path) as conn:
-        cur = conn.execute(
-            "SELECT id, explanation, confidence, created_at FROM interpretations WHERE id = ?",
-            (id_,),
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        return (row[0], row[1], float(row[2]), str(row[3]))
+    cur = _connect(db_path).execute(
+        "SELECT id, explanation, confidence, created_at FROM interpretations WHERE id = ?",
+        (id_,),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return (row[0], row[1], float(row[2]), str(row[3]))
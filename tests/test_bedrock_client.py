@@ -23,6 +23,30 @@ def test_parse_json_fallback_fenced_json():
     assert "ready to play" in result["explanation"].lower()
     assert abs(result["confidence"] - 0.88) < 1e-6
 
+def test_parse_json_fallback_empty_explanation():
+    text = json.dumps({"explanation": "", "confidence": 0.9})
+    result = _parse_json_fallback(text)
+    assert result["explanation"] == ""
+    assert abs(result["confidence"] - 0.9) < 1e-6
+
+def test_parse_json_fallback_confidence_only():
+    text = json.dumps({"confidence": 0.9})
+    result = _parse_json_fallback(text)
+    assert result["explanation"] == ""
+    assert abs(result["confidence"] - 0.9) < 1e-6
+
+def test_parse_json_fallback_labelled_confidence_line():
+    text = "I want to play!\nMy confidence: 0.9"
+    result = _parse_json_fallback(text)
+    assert result["explanation"] == "I want to play!"
+    assert abs(result["confidence"] - 0.9) < 1e-6
+
+def test_parse_json_fallback_bare_confidence_line():
+    text = "I want to play!\n0.9"
+    result = _parse_json_fallback(text)
+    assert result["explanation"] == "I want to play!"
+    assert abs(result["confidence"] - 0.9) < 1e-6
+
 @patch("boto3.client")
 def test_analyze_image_success(mock_boto_client):
     # Mock Bedrock client and response
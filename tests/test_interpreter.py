@@ -0,0 +1,42 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from src.backend.services.interpreter import InterpretationService
+
+
+def test_writer_flushes_in_progress_batch_on_shutdown():
+    # Rows the writer has pulled into its current batch (but not yet saved)
+    # must survive stop_writer() - their share_ids were already returned.
+    repo = MagicMock()
+    saved = []
+    repo.save_interpretations_bulk.side_effect = lambda rows: saved.extend(rows)
+
+    async def scenario():
+        svc = InterpretationService()
+        svc.start_writer(repo)
+        for i in range(5):
+            svc._queue.put_nowait((f"share{i}", None, "Woof!", 0.9, None))
+        # Let the writer collect the rows and park in its batch-wait window,
+        # then cancel it mid-batch.
+        await asyncio.sleep(0)
+        await svc.stop_writer()
+
+    asyncio.run(scenario())
+    assert sorted(row[0] for row in saved) == [f"share{i}" for i in range(5)]
+
+
+def test_writer_flushes_queued_rows_on_shutdown():
+    # Rows still sitting in the queue when the writer is cancelled before it
+    # ever ran must also be flushed.
+    repo = MagicMock()
+    saved = []
+    repo.save_interpretations_bulk.side_effect = lambda rows: saved.extend(rows)
+
+    async def scenario():
+        svc = InterpretationService()
+        svc.start_writer(repo)
+        svc._queue.put_nowait(("share0", None, "Woof!", 0.9, None))
+        await svc.stop_writer()
+
+    asyncio.run(scenario())
+    assert [row[0] for row in saved] == ["share0"]